@@ -6,18 +6,23 @@ Usage:
   
 Or pipe summary JSON via stdin:
   echo '{"tldr": "...", "ideas": [...]}' | python3 record_video.py <video_id> <title> <channel> <duration> --summary -
+
+Each video is stored in data/videos/<video_id>.json and listed in data/manifest.ndjson.
+Rebuild the combined data/videos.json with:
+  python3 video_store.py combine
 """
 
 import json
 import sys
 import time
 import argparse
-from pathlib import Path
 
-DATA_FILE = Path("/home/opc/.openclaw/workspace/yt-viewer/data/videos.json")
+from video_store import (
+    append_manifest, ensure_store, load_video, save_video, store_lock, video_path,
+)
 
 # Required fields for a valid summary
-REQUIRED_SUMMARY_FIELDS = {"tldr", "ideas", "insights"}
+REQUIRED_SUMMARY_FIELDS = ("tldr", "ideas", "insights")
 
 def validate_summary(summary: dict, video_id: str) -> dict:
     """
@@ -41,18 +46,19 @@ def validate_summary(summary: dict, video_id: str) -> dict:
             print(f"[WARN] Flattened nested summary structure for {video_id}", file=sys.stderr)
     
     # Check required fields
-    missing = REQUIRED_SUMMARY_FIELDS - set(summary.keys())
+    missing = [field for field in REQUIRED_SUMMARY_FIELDS if field not in summary]
     if missing:
-        raise ValueError(f"Summary missing required fields: {missing}")
+        raise ValueError(f"Summary missing required fields: {', '.join(missing)}")
     
     # Validate field types
-    if not isinstance(summary.get("tldr"), str) or not summary["tldr"].strip():
+    tldr = summary["tldr"]
+    if not isinstance(tldr, str) or not tldr.strip():
         raise ValueError("tldr must be a non-empty string")
     
-    if not isinstance(summary.get("ideas"), list):
+    if not isinstance(summary["ideas"], list):
         raise ValueError("ideas must be a list")
     
-    if not isinstance(summary.get("insights"), list):
+    if not isinstance(summary["insights"], list):
         raise ValueError("insights must be a list")
     
     # Ensure videoId is set
@@ -75,12 +81,11 @@ def main():
     
     args = parser.parse_args()
     
-    # Load existing data
-    if DATA_FILE.exists():
-        with open(DATA_FILE, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-    else:
-        data = {"videos": [], "updated_at": None}
+    try:
+        path = video_path(args.video_id)
+    except ValueError as e:
+        print(f"ERROR: {e}", file=sys.stderr)
+        sys.exit(1)
     
     # Load summary if provided
     summary = None
@@ -124,31 +129,24 @@ def main():
     if summary:
         video_entry["summary"] = summary
     
-    # Check if video already exists
-    existing_idx = None
-    for i, v in enumerate(data["videos"]):
-        if v["id"] == args.video_id:
-            existing_idx = i
-            break
-    
-    if existing_idx is not None:
+    # Only this video's file is read and written, plus one appended manifest line
+    with store_lock():
+        ensure_store()
+        
         # Update existing entry, preserve summary if not provided
-        if not summary and "summary" in data["videos"][existing_idx]:
-            video_entry["summary"] = data["videos"][existing_idx]["summary"]
-        data["videos"][existing_idx] = video_entry
+        existing = load_video(args.video_id)
+        if existing and not summary and "summary" in existing:
+            video_entry["summary"] = existing["summary"]
+        
+        save_video(video_entry)
+        append_manifest(args.video_id, video_entry["analyzed_at"])
+    
+    if existing is not None:
         print(f"Updated existing record for {args.video_id}")
     else:
-        data["videos"].append(video_entry)
         print(f"Added new record for {args.video_id}")
     
-    data["updated_at"] = int(time.time() * 1000)
-    
-    # Save data
-    DATA_FILE.parent.mkdir(parents=True, exist_ok=True)
-    with open(DATA_FILE, 'w', encoding='utf-8') as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
-    
-    print(f"Data saved to {DATA_FILE}")
+    print(f"Data saved to {path}")
 
 if __name__ == "__main__":
     main()
@@ -1,18 +1,50 @@
 #!/usr/bin/env python3
-"""Generate viz_data for videos that don't have it yet."""
+"""Generate viz_data for videos that don't have it yet.
+
+Usage:
+  python3 scripts/generate_viz.py [video_id ...]   # default: every video in the manifest
+"""
 
-import json
 import re
+import sys
+import time
+import argparse
 from pathlib import Path
 
-DATA_FILE = Path("/home/opc/.openclaw/workspace/yt-viewer/data/videos.json")
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from video_store import append_manifest, ensure_store, load_video, read_manifest, save_video, store_lock
+
+STOP_WORDS = {'的', '是', '在', '和', '了', '与', '对', '被', '将', '从', '到', 'the', 'and', 'to', 'of', 'a', 'is', 'in', 'for', 'on', 'that', 'this'}
+KEYWORD_RE = re.compile(r'[\u4e00-\u9fff]+|[a-zA-Z]{3,}')
+COMPARISON_KEYWORDS = ('vs', 'VS', '对比', '相比', '优势', '劣势', '传统', '新型', '地面', '太空', '之前', '之后')
+
+# Find patterns like "X万", "X%", "$X", "X年" etc in a single pass.
+# The $ branch only consumes "$" so a following "X万" etc is still matched.
+STATS_RE = re.compile(
+    r'(?P<wan>\d+(?:\.\d+)?)\s*万'
+    r'|(?P<yi>\d+(?:\.\d+)?)\s*亿'
+    r'|(?P<pct>\d+(?:\.\d+)?)\s*%'
+    r'|\$(?=(?P<usd>\d+(?:\.\d+)?[KMB]?))'
+    r'|(?P<year>\d+(?:-\d+)?)\s*年'
+    r'|(?P<bei>\d+(?:\.\d+)?)\s*倍'
+)
+# Output order per text (by kind, then position) and value format per kind
+STAT_KINDS = {
+    'wan': (0, '{}万'),
+    'yi': (1, '{}亿'),
+    'pct': (2, '{}%'),
+    'usd': (3, '${}'),
+    'year': (4, '{}年'),
+    'bei': (5, '{}倍'),
+}
 
 def extract_keywords(text):
     """Extract potential keywords from text."""
+    if not text:
+        return []
     # Simple keyword extraction - words > 2 chars, exclude common words
-    stop_words = {'的', '是', '在', '和', '了', '与', '对', '被', '将', '从', '到', 'the', 'and', 'to', 'of', 'a', 'is', 'in', 'for', 'on', 'that', 'this'}
-    words = re.findall(r'[\u4e00-\u9fff]+|[a-zA-Z]{3,}', text)
-    return [w for w in words if w.lower() not in stop_words][:5]
+    words = KEYWORD_RE.findall(text)
+    return [w for w in words if w.lower() not in STOP_WORDS][:5]
 
 def generate_mindmap(summary):
     """Generate mindmap structure from summary."""
@@ -67,37 +99,32 @@ def extract_stats(summary):
     
     all_text = facts + [i['text'] if isinstance(i, dict) else i for i in ideas]
     
-    # Find patterns like "X万", "X%", "$X", "X年" etc
-    patterns = [
-        (r'(\d+(?:\.\d+)?)\s*万', '万'),
-        (r'(\d+(?:\.\d+)?)\s*亿', '亿'),
-        (r'(\d+(?:\.\d+)?)\s*%', '%'),
-        (r'\$(\d+(?:\.\d+)?[KMB]?)', '$'),
-        (r'(\d+(?:-\d+)?)\s*年', '年'),
-        (r'(\d+(?:\.\d+)?)\s*倍', '倍'),
-    ]
-    
     seen = set()
     for text in all_text:
-        for pattern, suffix in patterns:
-            matches = re.findall(pattern, text)
-            for m in matches:
-                val = f"{m}{suffix}" if suffix != '$' else f"${m}"
-                if val not in seen and len(stats) < 6:
-                    # Try to extract context
-                    context = text[:20].strip()
-                    stats.append({"value": val, "label": context})
-                    seen.add(val)
+        if len(stats) >= 6:
+            break
+        found = []
+        for m in STATS_RE.finditer(text):
+            order, fmt = STAT_KINDS[m.lastgroup]
+            found.append((order, fmt.format(m.group(m.lastgroup))))
+        found.sort(key=lambda f: f[0])
+        for _, val in found:
+            if val not in seen and len(stats) < 6:
+                # Try to extract context
+                context = text[:20].strip()
+                stats.append({"value": val, "label": context})
+                seen.add(val)
     
     return stats[:6]
 
 def detect_comparison(summary):
     """Detect if content has comparison structure."""
-    ideas = summary.get('ideas', [])
-    all_text = ' '.join([i['text'] if isinstance(i, dict) else i for i in ideas])
-    
-    comparison_keywords = ['vs', 'VS', '对比', '相比', '优势', '劣势', '传统', '新型', '地面', '太空', '之前', '之后']
-    return any(kw in all_text for kw in comparison_keywords)
+    # Check idea by idea so the first hit returns without joining everything
+    for idea in summary.get('ideas', ()):
+        text = idea['text'] if isinstance(idea, dict) else idea
+        if any(kw in text for kw in COMPARISON_KEYWORDS):
+            return True
+    return False
 
 def generate_viz_data(summary):
     """Generate complete viz_data for a summary."""
@@ -122,32 +149,52 @@ def generate_viz_data(summary):
     return viz_data, suggested_viz
 
 def main():
-    with open(DATA_FILE, 'r') as f:
-        data = json.load(f)
+    parser = argparse.ArgumentParser(description='Generate viz_data for recorded videos')
+    parser.add_argument('video_ids', nargs='*', help='Only process these videos')
+    args = parser.parse_args()
+    
+    if args.video_ids:
+        video_ids = args.video_ids
+    else:
+        with store_lock():
+            ensure_store()
+            video_ids = list(read_manifest())
     
     updated = 0
-    for video in data['videos']:
-        summary = video.get('summary', {})
-        
-        # Skip if already has viz_data
-        if summary.get('viz_data'):
-            continue
-        
-        # Skip if no summary content
-        if not summary.get('ideas') and not summary.get('insights'):
-            continue
-        
-        viz_data, suggested_viz = generate_viz_data(summary)
-        
-        if viz_data:
-            video['summary']['viz_data'] = viz_data
-            if suggested_viz:
-                video['summary']['suggested_viz'] = suggested_viz
-            updated += 1
-            print(f"✓ {video['id']} | {video.get('title', 'Unknown')[:40]}")
-    
-    with open(DATA_FILE, 'w') as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
+    for video_id in video_ids:
+        # Lock per video so record_video.py runs are not blocked for the whole pass
+        with store_lock():
+            ensure_store()
+            try:
+                video = load_video(video_id)
+            except ValueError as e:
+                print(f"✗ {video_id} | {e}", file=sys.stderr)
+                continue
+            if video is None:
+                print(f"✗ {video_id} | not recorded", file=sys.stderr)
+                continue
+            
+            summary = video.get('summary', {})
+            
+            # Skip if already has viz_data
+            if summary.get('viz_data'):
+                continue
+            
+            # Skip if no summary content
+            if not summary.get('ideas') and not summary.get('insights'):
+                continue
+            
+            viz_data, suggested_viz = generate_viz_data(summary)
+            
+            if viz_data:
+                video['summary']['viz_data'] = viz_data
+                if suggested_viz:
+                    video['summary']['suggested_viz'] = suggested_viz
+                # Only the changed video's file is rewritten
+                save_video(video)
+                append_manifest(video_id, int(time.time() * 1000))
+                updated += 1
+                print(f"✓ {video['id']} | {video.get('title', 'Unknown')[:40]}")
     
     print(f"\n✅ Updated {updated} videos")
 
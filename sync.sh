@@ -21,7 +21,17 @@ echo "Syncing YT Viewer files to $CONTAINER..."
 sudo docker cp "${SRC_DIR}/index.html" "${CONTAINER}:${DEST_DIR}/"
 sudo docker cp "${SRC_DIR}/video.html" "${CONTAINER}:${DEST_DIR}/"
 
-# Sync data file
-sudo docker cp "${SRC_DIR}/data/videos.json" "${CONTAINER}:${DEST_DIR}/data/"
+# Rebuild and sync combined data file
+python3 "${SRC_DIR}/video_store.py" combine || exit 1
+sudo docker cp "${SRC_DIR}/data/videos.json" "${CONTAINER}:${DEST_DIR}/data/" || exit 1
+
+# Sync per-video files and manifest (trailing /. copies directory contents)
+if [ ! -d "${SRC_DIR}/data/videos" ]; then
+    echo "❌ ${SRC_DIR}/data/videos not found" >&2
+    exit 1
+fi
+sudo docker exec "$CONTAINER" mkdir -p "${DEST_DIR}/data/videos" || exit 1
+sudo docker cp "${SRC_DIR}/data/videos/." "${CONTAINER}:${DEST_DIR}/data/videos/" || exit 1
+sudo docker cp "${SRC_DIR}/data/manifest.ndjson" "${CONTAINER}:${DEST_DIR}/data/" || exit 1
 
 echo "✅ Files synced to ${DEST_DIR}"
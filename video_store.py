@@ -0,0 +1,278 @@
+#!/usr/bin/env python3
+"""
+Shared load/save helpers for the YT Viewer data store.
+
+Layout (under data/):
+  videos/<id>.json   one file per video, the source of truth
+  manifest.ndjson    append-only {"id", "updated_at"} lines; read as {id: updated_at}
+                     in first-recorded order, the last line for an id wins
+  videos.json        combined file, rebuilt from the two above for consumers that want one file
+
+Recording a video reads and writes only its own file and appends one manifest
+line. Writers hold store_lock() around each read-modify-write. An existing
+videos.json (and any videos.ndjson journal) is split into per-video files the
+first time the store is opened, i.e. when data/videos/ does not exist yet.
+
+Uses orjson when it is installed and falls back to the stdlib json module.
+Both paths produce the same bytes (2-space indent, UTF-8, no ASCII escaping).
+
+  python3 video_store.py combine    # rebuild videos.json
+"""
+
+import fcntl
+import json
+import os
+import shutil
+import sys
+import time
+import argparse
+from contextlib import contextmanager
+from pathlib import Path
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+DATA_FILE = Path("/home/opc/.openclaw/workspace/yt-viewer/data/videos.json")
+VIDEOS_DIR = DATA_FILE.parent / "videos"
+MANIFEST_FILE = DATA_FILE.parent / "manifest.ndjson"
+LOCK_FILE = DATA_FILE.parent / ".videos.lock"
+# Append-only journal used before the per-video layout; only read during migration
+JOURNAL_FILE = DATA_FILE.with_suffix(".ndjson")
+
+def _loads(raw: bytes):
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw.decode('utf-8'))
+
+def dump_bytes(data: dict) -> bytes:
+    """Serialize data in the store's on-disk format."""
+    if orjson is not None:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2)
+    return json.dumps(data, ensure_ascii=False, indent=2).encode('utf-8')
+
+def dump_line(entry: dict) -> bytes:
+    """Serialize one record as a single newline-terminated line."""
+    if orjson is not None:
+        return orjson.dumps(entry) + b"\n"
+    return json.dumps(entry, ensure_ascii=False, separators=(',', ':')).encode('utf-8') + b"\n"
+
+def write_atomic(path: Path, data) -> None:
+    """Write data (a dict, or already serialized bytes) to path via a fsynced temp file and os.replace."""
+    raw = data if isinstance(data, bytes) else dump_bytes(data)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    with open(tmp, 'wb') as f:
+        f.write(raw)
+        f.flush()
+        os.fsync(f.fileno())
+    # A crash before this point leaves the previous file intact
+    os.replace(tmp, path)
+
+@contextmanager
+def store_lock():
+    """Hold an exclusive lock on the store. Not reentrant: take it once per operation."""
+    LOCK_FILE.parent.mkdir(parents=True, exist_ok=True)
+    with open(LOCK_FILE, 'a') as f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+def video_path(video_id: str) -> Path:
+    """Path of the per-video file. Raises ValueError for ids unusable as file names."""
+    if not video_id or video_id.startswith('.') or '/' in video_id or '\\' in video_id:
+        raise ValueError(f"Invalid video id: {video_id!r}")
+    return VIDEOS_DIR / f"{video_id}.json"
+
+def load_video(video_id: str):
+    """Load one video entry, or None if it is not recorded."""
+    path = video_path(video_id)
+    if not path.exists():
+        return None
+    return _loads(path.read_bytes())
+
+def save_video(entry: dict) -> None:
+    """Write one video entry to its own file."""
+    write_atomic(video_path(entry["id"]), entry)
+
+def _claim_journal() -> list:
+    """
+    Move the legacy journal aside under a unique name before it is read, so
+    records appended meanwhile go to a fresh journal instead of being dropped.
+    Returns every claimed journal, oldest first, including ones left over by an
+    interrupted migration.
+    """
+    if JOURNAL_FILE.exists():
+        os.replace(JOURNAL_FILE, JOURNAL_FILE.with_name(f"{JOURNAL_FILE.name}.{time.time_ns()}.compacting"))
+    return sorted(JOURNAL_FILE.parent.glob(f"{JOURNAL_FILE.name}.*.compacting"))
+
+def _load_legacy(journals: list) -> tuple:
+    """
+    Load the old combined videos.json with the given journals applied in order.
+    Returns (data, number of journal records applied), counted from the same bytes.
+    """
+    if DATA_FILE.exists():
+        data = _loads(DATA_FILE.read_bytes())
+    else:
+        data = {"videos": [], "updated_at": None}
+
+    applied = 0
+    index = {v["id"]: i for i, v in enumerate(data["videos"])}
+    for journal in journals:
+        for lineno, line in enumerate(journal.read_bytes().splitlines(), 1):
+            if not line.strip():
+                continue
+            try:
+                entry = _loads(line)
+            except ValueError:
+                # Typically a partial last line from an interrupted append
+                print(f"[WARN] Skipping unreadable journal line {lineno} in {journal}", file=sys.stderr)
+                continue
+            # Last write wins; an existing summary is kept if the record has none
+            existing_idx = index.get(entry["id"])
+            if existing_idx is not None:
+                existing = data["videos"][existing_idx]
+                if "summary" not in entry and "summary" in existing:
+                    entry["summary"] = existing["summary"]
+                data["videos"][existing_idx] = entry
+            else:
+                index[entry["id"]] = len(data["videos"])
+                data["videos"].append(entry)
+            data["updated_at"] = entry["analyzed_at"]
+            applied += 1
+
+    return data, applied
+
+def migrate() -> dict:
+    """
+    Split the legacy combined store into per-video files and write the manifest.
+    Files are staged in a sibling directory and renamed into place, so an
+    interrupted migration never leaves a partial VIDEOS_DIR behind.
+    """
+    journals = _claim_journal()
+    data, applied = _load_legacy(journals)
+    staging = VIDEOS_DIR.with_name(VIDEOS_DIR.name + ".migrating")
+    if staging.exists():
+        shutil.rmtree(staging)
+    staging.mkdir(parents=True)
+    manifest = {}
+    for video in data["videos"]:
+        try:
+            name = video_path(video["id"]).name
+        except ValueError as e:
+            print(f"[WARN] Not migrating: {e}", file=sys.stderr)
+            continue
+        write_atomic(staging / name, video)
+        manifest[video["id"]] = video.get("analyzed_at")
+    os.rename(staging, VIDEOS_DIR)
+    write_manifest(manifest)
+    # Only the journals that were actually applied are removed
+    for journal in journals:
+        journal.unlink()
+    print(f"[INFO] Migrated {len(manifest)} videos to {VIDEOS_DIR} "
+          f"({applied} journal records applied)", file=sys.stderr)
+    return manifest
+
+def _scan_videos() -> list:
+    """Ids of every per-video file on disk."""
+    with os.scandir(VIDEOS_DIR) as it:
+        return [entry.name[:-len(".json")] for entry in it
+                if entry.name.endswith(".json") and entry.is_file()]
+
+def rebuild_manifest() -> dict:
+    """Recreate a lost manifest from the per-video files, ordered by analyzed_at."""
+    manifest = {}
+    videos = [load_video(video_id) for video_id in _scan_videos()]
+    for video in sorted(videos, key=lambda v: (v.get("analyzed_at") or 0, v["id"])):
+        manifest[video["id"]] = video.get("analyzed_at")
+    write_manifest(manifest)
+    print(f"[WARN] Rebuilt {MANIFEST_FILE} from {len(manifest)} files in {VIDEOS_DIR}", file=sys.stderr)
+    return manifest
+
+def ensure_store() -> None:
+    """
+    Prepare the store for use. Call with store_lock() held.
+    The legacy videos.json is only split when VIDEOS_DIR does not exist yet;
+    after that it is a build output and is never read again.
+    """
+    if not VIDEOS_DIR.exists():
+        migrate()
+    elif not MANIFEST_FILE.exists():
+        rebuild_manifest()
+
+def read_manifest() -> dict:
+    """Return {id: updated_at} in first-recorded order; the last line for an id wins."""
+    manifest = {}
+    if not MANIFEST_FILE.exists():
+        return manifest
+    for lineno, line in enumerate(MANIFEST_FILE.read_bytes().splitlines(), 1):
+        if not line.strip():
+            continue
+        try:
+            item = _loads(line)
+        except ValueError:
+            print(f"[WARN] Skipping unreadable manifest line {lineno} in {MANIFEST_FILE}", file=sys.stderr)
+            continue
+        manifest[item["id"]] = item["updated_at"]
+    return manifest
+
+def append_manifest(video_id: str, updated_at: int) -> None:
+    """Append one manifest line. Call with store_lock() held."""
+    MANIFEST_FILE.parent.mkdir(parents=True, exist_ok=True)
+    with open(MANIFEST_FILE, 'ab') as f:
+        f.write(dump_line({"id": video_id, "updated_at": updated_at}))
+
+def write_manifest(manifest: dict) -> None:
+    """Rewrite the manifest with one line per id. Call with store_lock() held."""
+    write_atomic(MANIFEST_FILE, b"".join(
+        dump_line({"id": video_id, "updated_at": updated_at}) for video_id, updated_at in manifest.items()
+    ))
+
+def load_data(manifest: dict) -> dict:
+    """
+    Assemble the combined {"videos": [...], "updated_at"} view from per-video files.
+    Files missing from the manifest are reported and added to it (in memory).
+    """
+    for video_id in _scan_videos():
+        if video_id not in manifest:
+            video = load_video(video_id)
+            print(f"[WARN] {video_id} has a file but is not in the manifest; adding it", file=sys.stderr)
+            manifest[video_id] = video.get("analyzed_at")
+    videos = []
+    for video_id in manifest:
+        video = load_video(video_id)
+        if video is None:
+            print(f"[WARN] {video_id} is in the manifest but has no file", file=sys.stderr)
+            continue
+        videos.append(video)
+    return {"videos": videos, "updated_at": max(filter(None, manifest.values()), default=None)}
+
+def combine() -> int:
+    """
+    Rebuild videos.json from the per-video files and compact the manifest
+    to one line per id. Returns the number of videos.
+    """
+    with store_lock():
+        ensure_store()
+        manifest = read_manifest()
+        data = load_data(manifest)
+        write_atomic(DATA_FILE, data)
+        write_manifest(manifest)
+    return len(data["videos"])
+
+def main():
+    parser = argparse.ArgumentParser(description='YT Viewer data store maintenance')
+    sub = parser.add_subparsers(dest='command', required=True)
+    sub.add_parser('combine', help='Rebuild videos.json from data/videos/*.json')
+
+    args = parser.parse_args()
+
+    if args.command == 'combine':
+        count = combine()
+        print(f"Combined {count} videos into {DATA_FILE}")
+
+if __name__ == "__main__":
+    main()